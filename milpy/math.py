@@ -1,5 +1,6 @@
 """Math functions that don't seem to exist elsewhere."""
 
+import math
 import numpy as np
 from typing import Union
 
@@ -45,6 +46,62 @@ def haversine(lat0: float, lon0: float, lat1: Union[float, np.ndarray], lon1: Un
     (3, 3)
     """
 
+    if isinstance(lat1, float) and isinstance(lon1, float):
+        # plain floats don't need the overhead of numpy's ufunc machinery
+        ha = math.sin((lat0 - lat1) / 2) ** 2
+        hb = math.cos(lat1) * math.cos(lat0) * math.sin((lon0 - lon1) / 2) ** 2
+        return math.degrees(2 * math.asin(math.sqrt(ha + hb)))
+
     ha = np.sin((lat0 - lat1) / 2) ** 2
     hb = np.cos(lat1) * np.cos(lat0) * np.sin((lon0 - lon1) / 2) ** 2
-    return np.degrees(2 * np.arcsin(np.sqrt(ha + hb)))
+    angle = np.add(ha, hb)
+    if isinstance(angle, np.ndarray):
+        # finish the formula in place so large arrays don't allocate a new temporary for every step
+        np.sqrt(angle, out=angle)
+        np.arcsin(angle, out=angle)
+        angle *= 360 / np.pi  # doubles the angle and converts it to degrees in the same pass
+        return angle
+    return np.degrees(2 * np.arcsin(np.sqrt(angle)))
+
+
+def great_circle_points(lat0: float, lon0: float, lat1: float, lon1: float, n_points: int) -> np.ndarray:
+
+    """
+    Calculates evenly-spaced points along the great circle between two coordinate points on a sphere. Like
+    `pyproj.Geod.npts`, only the intermediate points are returned, not the start and end points themselves.
+
+    Parameters
+    ----------
+    lat0
+        Starting latitude.
+    lon0
+        Starting longitude.
+    lat1
+        Ending latitude.
+    lon1
+        Ending longitude.
+    n_points
+        The number of intermediate points.
+
+    Returns
+    -------
+    An array of coordinates with shape (n_points, 2). The first entry in axis 1 is longitude, the second is latitude.
+
+    Notes
+    -----
+    All inputs and outputs are in degrees. The points are found by spherical linear interpolation between the unit
+    vectors of the start and end points, which is indistinguishable from the ellipsoidal geodesic at the scale of a map.
+    """
+
+    lat0, lon0, lat1, lon1 = np.radians([lat0, lon0, lat1, lon1])
+    start = np.array([np.cos(lat0) * np.cos(lon0), np.cos(lat0) * np.sin(lon0), np.sin(lat0)])
+    end = np.array([np.cos(lat1) * np.cos(lon1), np.cos(lat1) * np.sin(lon1), np.sin(lat1)])
+    omega = np.arccos(np.clip(np.dot(start, end), -1, 1))
+    t = np.arange(1, n_points + 1)[:, None] / (n_points + 1)
+    if np.sin(omega) == 0:
+        points = np.repeat(start[None, :], n_points, axis=0)
+    else:
+        points = (np.sin((1 - t) * omega) * start + np.sin(t * omega) * end) / np.sin(omega)
+    longitudes = np.degrees(np.arctan2(points[:, 1], points[:, 0]))
+    latitudes = np.degrees(np.arctan2(points[:, 2], np.hypot(points[:, 0], points[:, 1])))
+    return np.column_stack([longitudes, latitudes])
@@ -1,5 +1,7 @@
 import os
 
+_ESCAPE_TABLE = str.maketrans({character: f'\\{character}' for character in '|&:;()<>~*@?!$#"` ' + "'"})
+
 
 class ValidatePath(str):
 
@@ -29,9 +31,9 @@ class ValidateDirectory(str):
 
     @staticmethod
     def _create_directory_if_it_does_not_exist(path: str):
-        directory = os.path.dirname(path)
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        """Not cached, so a directory removed after its first use is made
+        again; exist_ok keeps concurrent callers from racing."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
 
 class EscapedString(str):
@@ -63,10 +65,7 @@ class EscapedString(str):
 
     @staticmethod
     def _add_backslashes_before_special_characters(string: str) -> str:
-        special_characters = '|&:;()<>~*@?!$#"` ' + "'"
-        for i in special_characters:
-            string = string.replace(i, rf'\{i}')
-        return string
+        return string.translate(_ESCAPE_TABLE)
 
     @property
     def original(self) -> str:
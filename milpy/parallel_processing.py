@@ -1,11 +1,9 @@
 import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
 
 
 def get_appropriate_number_of_cores():
-    n_cores = int(mp.cpu_count()/2 - 1)
-    if n_cores < 1:
-        n_cores = 1
-    return n_cores
+    return max(1, mp.cpu_count() - 1)
 
 
 def set_processor_pool(n_cores):
@@ -22,6 +20,15 @@ def get_multiprocessing_pool(n_cores=None):
     return pool
 
 
+def get_thread_pool_executor(n_cores=None):
+    """
+    The thread counterpart of get_multiprocessing_pool, for jobs that spend their time waiting on an external program.
+    """
+    if n_cores is None:
+        n_cores = get_appropriate_number_of_cores()
+    return ThreadPoolExecutor(max_workers=n_cores)
+
+
 def cleanup_parallel_processing(pool):
     """
     No one knows what these do...but things don't work without them.
@@ -1,11 +1,13 @@
 import os
 from typing import Iterable
-from milpy.miscellaneous import EscapedString
 
 
 def path_to_system_executable(executable: str) -> str:
-    path = EscapedString(os.path.join(os.path.dirname(__file__), executable))
-    os.system(f'chmod 777 {path}')
+    """
+    The path to a bundled executable, made executable.
+    """
+    path = os.path.join(os.path.dirname(__file__), executable)
+    os.chmod(path, 0o777)
     return path
 
 
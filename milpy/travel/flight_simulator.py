@@ -6,26 +6,95 @@ import os
 import re
 import sys
 import time
+from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from itertools import islice
 
 import cartopy.crs as ccrs
 import ephem
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 import pandas as pd
 import pytz
-from pyproj import Geod
 from shapely.geometry.polygon import LinearRing
-from fuzzywuzzy import process
+from rapidfuzz import process, utils
 
-from milpy.math import haversine
+from milpy.math import haversine, great_circle_points
+from milpy.parallel_processing import get_multiprocessing_pool, cleanup_parallel_processing, \
+    get_appropriate_number_of_cores
 
 
 def _get_current_directory():
     return os.path.dirname(__file__)
 
 
+@lru_cache(maxsize=None)
+def _load_database(path_to_database: str) -> pd.DataFrame:
+
+    """
+    This function loads one of the CSV databases. Each database is only read from disk once.
+
+    Parameters
+    ----------
+    path_to_database
+        Relative path to the database, e.g., "anc/database.csv."
+
+    Returns
+    -------
+    The database as a DataFrame.
+    """
+
+    return pd.read_csv(os.path.join(_get_current_directory(), path_to_database))
+
+
+@lru_cache(maxsize=None)
+def _get_database_index(path_to_database: str) -> dict:
+
+    """
+    This function makes a lookup table from the names in one of the CSV databases to their row numbers. If a name
+    appears more than once, the first row is kept.
+
+    Parameters
+    ----------
+    path_to_database
+        Relative path to the database, e.g., "anc/database.csv."
+
+    Returns
+    -------
+    A dictionary with names as keys and row numbers as values.
+    """
+
+    index = {}
+    for row, name in enumerate(_load_database(path_to_database)["Name"].values):
+        index.setdefault(name, row)
+    return index
+
+
+@lru_cache(maxsize=None)
+def _get_database_choices(path_to_database: str) -> list:
+
+    """
+    This function normalizes (lowercases and strips punctuation from) the names in one of the CSV databases for fuzzy
+    matching. Doing this once here means it doesn't have to happen for every comparison.
+
+    Parameters
+    ----------
+    path_to_database
+        Relative path to the database, e.g., "anc/database.csv."
+
+    Returns
+    -------
+    A list of the normalized names in database order.
+    """
+
+    return [utils.default_process(str(name)) for name in _load_database(path_to_database)["Name"].values]
+
+
+@lru_cache(maxsize=4096)
 def _get_line_from_database(path_to_database: str, query_item: str, query_type: str):
 
     """
@@ -53,13 +122,14 @@ def _get_line_from_database(path_to_database: str, query_item: str, query_type:
     """
 
     absolute_path_to_database = os.path.join(_get_current_directory(), path_to_database)
-    database = pd.read_csv(absolute_path_to_database)
-    values = database["Name"].values
-    ind = np.where(values == query_item)[0]
-    if len(ind) == 0:
-        try:
-            possibilities = np.array(process.extract(query_item, values))[:, 0]
-        except IndexError:
+    database = _load_database(path_to_database)
+    row = _get_database_index(path_to_database).get(query_item)
+    if row is None:
+        values = database["Name"].values
+        matches = process.extract(utils.default_process(query_item), _get_database_choices(path_to_database),
+                                  processor=None, limit=5, score_cutoff=1)
+        possibilities = [values[match[2]] for match in matches]
+        if len(possibilities) == 0:
             possibilities = ["No matches found."]
         error_string = f"Could not find {query_type} \"{query_item}\". Is one of these the {query_type} you want?\n"
         for possibility in possibilities:
@@ -67,7 +137,7 @@ def _get_line_from_database(path_to_database: str, query_item: str, query_type:
         error_string += f"If not, check your spelling or the database at\n   \"{absolute_path_to_database}\".\n"
         raise ValueError(error_string)
     else:
-        return database.values[ind[0]]
+        return database.values[row]
 
 
 # Note: if used by another travel/something.py, these should go into their own file somewhere
@@ -167,6 +237,46 @@ class _Aircraft:
         return print_string
 
 
+@lru_cache(maxsize=1)
+def _get_sza_grid() -> (np.ndarray, np.ndarray):
+
+    """
+    This function creates the latitude and longitude grid (in radians) of the cylindrical map. They are returned as a
+    column and a row so they broadcast to the full 1800x3600 map shape, and are only ever made once since they don't
+    change from frame to frame.
+
+    Returns
+    -------
+    A tuple of (latitudes, longitudes) with shapes (1800, 1) and (1, 3600).
+    """
+
+    longitudes = np.linspace(np.radians(-180), np.radians(180), 3600, dtype=np.float32)[None, :]
+    latitudes = np.linspace(np.radians(-90), np.radians(90), 1800, dtype=np.float32)[:, None]
+    longitudes.flags.writeable = False
+    latitudes.flags.writeable = False
+    return latitudes, longitudes
+
+
+@lru_cache(maxsize=None)
+def _get_timezone(timezone: str) -> pytz.BaseTzInfo:
+
+    """
+    This function gets a timezone object from its name, only looking up each timezone once.
+
+    Parameters
+    ----------
+    timezone
+        The name of the timezone. For a list of all possible timezones, query the pytz package with
+        `pytz.all_timezones`.
+
+    Returns
+    -------
+    The timezone object.
+    """
+
+    return pytz.timezone(timezone)
+
+
 def _calculate_subsolar_position(date_time: datetime) -> (float, float):
 
     """
@@ -214,8 +324,7 @@ class _DayNightMapCreator:
 
         self.sub_solar_latitude = sub_solar_latitude
         self.sub_solar_longitude = sub_solar_longitude
-        self.day_map = self.convert_to_float_image(self.load_image('anc/earth_day.jpg'))
-        self.night_map = self.convert_to_float_image(self.load_image('anc/earth_night.jpg'))
+        self.day_map, self.night_map = _load_earth_maps()
 
     @staticmethod
     def load_image(path_to_image):
@@ -223,19 +332,20 @@ class _DayNightMapCreator:
 
     @staticmethod
     def convert_to_float_image(image_array):
-        return image_array / 255
+        return image_array.astype(np.float32) / 255
 
     def sza(self) -> np.ndarray:
 
         """
         This method creates an 1800x3600 array of angles from the sub-solar position. Any positions with angles below 90°
-        are day time, from 90° to 102° are twilight, and above 102° are night time.
+        are day time, from 90° to 102° are twilight, and above 102° are night time. The angles are single precision,
+        which is plenty for blending the map images.
         """
 
-        longitudes = np.linspace(np.radians(-180), np.radians(180), 3600)
-        latitudes = np.linspace(np.radians(-90), np.radians(90), 1800)
-        longitudes, latitudes = np.meshgrid(longitudes, latitudes)
-        return haversine(np.radians(self.sub_solar_latitude), np.radians(self.sub_solar_longitude), latitudes, longitudes)
+        latitudes, longitudes = _get_sza_grid()
+        # pass the Sun's position as float32 too, otherwise NumPy 2 promotes the whole grid to float64
+        return haversine(np.float32(np.radians(self.sub_solar_latitude)),
+                         np.float32(np.radians(self.sub_solar_longitude)), latitudes, longitudes)
 
     @staticmethod
     def terminator_mask(sza_arr: np.ndarray) -> np.ndarray:
@@ -254,15 +364,13 @@ class _DayNightMapCreator:
         An array of multiplication factors to replicate day/night transition.
         """
 
-        ind90 = np.where(sza_arr <= 90)
-        ind108 = np.where(sza_arr > 108)
         sza_arr -= 90
         sza_arr /= 18
-        sza_arr[ind90] = 0
-        sza_arr[ind108] = 1
+        np.clip(sza_arr, 0, 1, out=sza_arr)
         sza_arr *= np.pi / 2
-        sza_arr = np.cos(sza_arr) ** 2
-        return np.flipud(np.repeat(sza_arr[:, :, None], 3, axis=2))
+        np.cos(sza_arr, out=sza_arr)
+        sza_arr **= 2
+        return np.broadcast_to(sza_arr[::-1, :, None], (*sza_arr.shape, 3))
 
     def map(self) -> np.ndarray:
 
@@ -276,7 +384,30 @@ class _DayNightMapCreator:
         """
 
         twilight_mask = self.terminator_mask(self.sza())
-        return (self.day_map * twilight_mask) + (self.night_map * (1 - twilight_mask))
+        # night + mask * (day - night) is the same blend, but it only needs one full-size array instead of four
+        cyl_map = np.subtract(self.day_map, self.night_map)
+        cyl_map *= twilight_mask
+        cyl_map += self.night_map
+        return cyl_map
+
+
+@lru_cache(maxsize=1)
+def _load_earth_maps() -> (np.ndarray, np.ndarray):
+
+    """
+    This function loads the day and night surface images of Earth. They only need to be decoded once, after which
+    every map shares them (so they are made read-only).
+
+    Returns
+    -------
+    A tuple of (day map, night map) as float images with dimensions (1800, 3600, 3).
+    """
+
+    day_map = _DayNightMapCreator.convert_to_float_image(_DayNightMapCreator.load_image('anc/earth_day.jpg'))
+    night_map = _DayNightMapCreator.convert_to_float_image(_DayNightMapCreator.load_image('anc/earth_night.jpg'))
+    day_map.flags.writeable = False
+    night_map.flags.writeable = False
+    return day_map, night_map
 
 
 class _DayNightMap(np.ndarray):
@@ -298,6 +429,53 @@ class _DayNightMap(np.ndarray):
         self.sub_solar_longitude = getattr(obj, 'sub_solar_longitude', None)
 
 
+@lru_cache(maxsize=2)
+def _get_day_night_map(sub_solar_latitude: int, sub_solar_longitude: int) -> _DayNightMap:
+
+    """
+    This function makes the day/night map for a sub-solar position rounded to the nearest degree. The Sun only moves
+    about a quarter of a degree per minute, so consecutive frames can share the same map; a one-degree shift in the
+    terminator isn't visible at the scale of the animation.
+
+    Parameters
+    ----------
+    sub_solar_latitude
+        The latitude position of the Sun rounded to the nearest degree.
+    sub_solar_longitude
+        The longitude position of the Sun rounded to the nearest degree.
+
+    Returns
+    -------
+    The cylindrical day/night map.
+    """
+
+    return _DayNightMap(sub_solar_latitude, sub_solar_longitude)
+
+
+@lru_cache(maxsize=4)
+def _get_orthographic_boundary(a: float, b: float) -> LinearRing:
+
+    """
+    This function makes a high-resolution (3601-point) elliptical boundary for an orthographic projection. It only
+    depends on the size of the globe, so it is made once and shared by every frame.
+
+    Parameters
+    ----------
+    a
+        The semimajor axis of the globe in meters.
+    b
+        The semiminor axis of the globe in meters.
+
+    Returns
+    -------
+    The boundary of the projection.
+    """
+
+    t = np.linspace(0, 2 * np.pi, 3601)
+    coords = np.vstack([a * 0.99999 * np.cos(t), b * 0.99999 * np.sin(t)])[:, ::-1]
+    return LinearRing(coords.T)
+
+
 class _FlightParameters:
 
     """This class stores specific flight parameters and calculates some information needed for the animation."""
@@ -333,6 +511,7 @@ class _FlightParameters:
         self.n_frames = int(self.duration.total_seconds() / 60) + 1
         self.flight_path = self.calculate_flight_path()
         self.camera_path = self.calculate_camera_path()
+        self.subsolar_path = self.calculate_subsolar_path()
 
     @staticmethod
     def dateline_fix(coordinates):
@@ -354,10 +533,8 @@ class _FlightParameters:
         latitude.
         """
 
-        geod = Geod("+ellps=WGS84")
-        flight_path = np.array(geod.npts(lon1=self.departure_airport.longitude, lat1=self.departure_airport.latitude,
-                                         lon2=self.arrival_airport.longitude, lat2=self.arrival_airport.latitude,
-                                         npts=self.n_frames))
+        flight_path = great_circle_points(self.departure_airport.latitude, self.departure_airport.longitude,
+                                          self.arrival_airport.latitude, self.arrival_airport.longitude, self.n_frames)
         return self.dateline_fix(flight_path)
 
     def calculate_camera_path(self) -> np.ndarray:
@@ -372,11 +549,24 @@ class _FlightParameters:
         is latitude.
         """
 
-        camera_path = self.flight_path.copy()
-        lons = camera_path[:, 0]
-        lats = camera_path[:, 1]
-        lats = np.linspace(lats[0], lats[-1], self.n_frames)  # redo latitudes to move straight from start to end
-        return self.dateline_fix(np.array([lons, lats]).T)
+        lons = self.flight_path[:, 0]
+        lats = np.linspace(self.flight_path[0, 1], self.flight_path[-1, 1], self.n_frames)  # move straight from start to end
+        return self.dateline_fix(np.column_stack([lons, lats]))
+
+    def calculate_subsolar_path(self) -> np.ndarray:
+
+        """
+        This method calculates the sub-solar position for each frame in the animation, so it only has to be done once
+        rather than every time a frame is rendered.
+
+        Returns
+        -------
+        An array of sub-solar coordinates with shape (n, 2). The first entry in axis 1 is latitude, the second is
+        longitude.
+        """
+
+        return np.array([_calculate_subsolar_position(self.departure_time + timedelta(minutes=minute))
+                         for minute in range(self.n_frames)])
 
 
 class Flight:
@@ -451,8 +641,9 @@ class Flight:
         return print_string
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def _printable_datetime(datetime_obj, timezone):
-        return datetime.strftime(datetime_obj.astimezone(pytz.timezone(timezone)), '%a, %b %d, %Y, %I:%M %p').replace(' 0', ' ')
+        return datetime.strftime(datetime_obj.astimezone(_get_timezone(timezone)), '%a, %b %d, %Y, %I:%M %p').replace(' 0', ' ')
 
     @staticmethod
     def _highres_orthographic(projection: ccrs.Projection) -> None:
@@ -470,12 +661,10 @@ class Flight:
         r = 6378137  # radius of Earth in meters
         a = float(projection.globe.semimajor_axis or r)
         b = float(projection.globe.semiminor_axis or a)
-        t = np.linspace(0, 2 * np.pi, 3601)
-        coords = np.vstack([a * 0.99999 * np.cos(t), b * 0.99999 * np.sin(t)])[
-                 :, ::-1]
-        projection._boundary = LinearRing(coords.T)
+        projection._boundary = _get_orthographic_boundary(a, b)
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def _convert_time_to_utc(date_time: str, timezone: str) -> datetime:
 
         """
@@ -495,30 +684,23 @@ class Flight:
         """
 
         dt = datetime.strptime(date_time, '%B %d, %Y, %I:%M %p')
-        tz = pytz.timezone(timezone)
+        tz = _get_timezone(timezone)
         dt = tz.localize(dt)
         return dt.astimezone(pytz.utc)
 
-    def _func_animate(self, iterator: int, t0: float, highres: bool):
+    def _print_progress(self, iterator: int, t0: float) -> None:
 
         """
-        This is the iterable animation function required by `matplotlib.animation.FuncAnimation`.
+        This method prints a progress report for the animation.
 
         Parameters
         ----------
         iterator
-            The first argument of this method must be the iterator passed by `matplotlib.animation.FuncAnimation`.
+            The index of the frame which was just finished.
         t0
-            The time when the system began making the animation (for printing out progress report).
-        highres
-            Whether or not to display the surface map in native Cartopy resolution (which for some reason is 700x1400),
-            or the higher resolution of the video itself (currently 1280x2560).
+            The time when the system began making the animation.
         """
 
-        # remove any existing axes
-        plt.gca().remove()
-
-        # print progress report
         seconds = time.time() - t0
         m, s = divmod(seconds, 60)
         h, m = divmod(m, 60)
@@ -526,47 +708,104 @@ class Flight:
               f'({(iterator + 1) / self.flight_parameters.n_frames * 100.:.2f}%), '
               f'{int(h)}:{int(m):0>2}:{int(s):0>2} elapsed...' + ' ' * 20, end='\r')
 
-        # create high-resolution orthographic projection and place in an axis; also define the coordinate transform
-        projection = ccrs.Orthographic(central_longitude=self.flight_parameters.camera_path[iterator, 0],
-                                       central_latitude=self.flight_parameters.camera_path[iterator, 1])
-        self._highres_orthographic(projection)
-        transform = ccrs.PlateCarree()
-        ax = plt.axes([0.1, 0.1, 0.8, 0.8], projection=projection, facecolor='k')
+    def _render_frames(self, iterators: range, highres: bool) -> [np.ndarray]:
 
-        # define imshow parameters
-        imshow_params = {'extent': [-180, 180, -90, 90], 'origin': 'upper', 'transform': transform}
-        if highres:
-            imshow_params['regrid_shape'] = (1280, 2560)
+        """
+        This method draws a block of consecutive frames of the animation and returns them as images. The figure and the
+        text which doesn't change are only made once per block; for each frame only the globe axis (whose projection
+        follows the camera) and the elapsed time are redrawn. Blocks are independent of each other, so they can be
+        rendered in separate processes.
+
+        Parameters
+        ----------
+        iterators
+            The indices of the frames (the number of minutes since departure).
+        highres
+            Whether or not to display the surface map in native Cartopy resolution (which for some reason is 700x1400),
+            or the higher resolution of the video itself (currently 1280x2560).
 
-        # display the Earth surface image for current time in the flight
-        sub_solar_latitude, sub_solar_longitude = _calculate_subsolar_position(self.departure_time + timedelta(minutes=iterator))
-        surface_image = _DayNightMap(sub_solar_latitude, sub_solar_longitude)
-        ax.imshow(surface_image, **imshow_params)
+        Returns
+        -------
+        A list of the rendered frames as RGB image arrays with dimensions (1600, 1600, 3).
+        """
 
-        # plot the red flight path and point indicating the position of the plane
-        ax.plot(self.flight_parameters.flight_path[:iterator, 0], self.flight_parameters.flight_path[:iterator, 1],
-                linewidth=2, color='tab:red', transform=transform)
-        ax.scatter([self.flight_parameters.flight_path[iterator, 0]], [self.flight_parameters.flight_path[iterator, 1]],
-                   s=15, color='tab:red', edgecolor='none', transform=transform)
+        # make a figure which isn't managed by pyplot so it can be safely drawn in a worker process
+        fig = Figure(figsize=(8, 8), facecolor='k', dpi=200)
+        canvas = FigureCanvasAgg(fig)
 
         # place text
-        fig = plt.gcf()
-        text_params = dict(transform=fig.transFigure, color='white', ha='left', va='top', fontsize=8)
+        text_params = dict(color='white', ha='left', va='top', fontsize=8)
         meta_text = [fr'$\bf Origin:$ {self.departure_airport.name} ({self.departure_airport.IATA})',
                      fr'$\bf Destination:$ {self.arrival_airport.name} ({self.arrival_airport.IATA})',
                      fr"$\bf Departure\ Time:$ {self._printable_datetime(self.departure_time, self.departure_airport.timezone)}",
                      fr"$\bf Arrival\ Time:$ {self._printable_datetime(self.arrival_time, self.arrival_airport.timezone)}",
                      fr'$\bf Aircraft:$ {self.aircraft.manufacturer} {self.aircraft.type}',
-                     fr'$\bf Flight\ Time\ Elapsed:$ {int(divmod(iterator, 60)[0])}h {int(divmod(iterator, 60)[1]):0>2}m',
                      ]
         title_string = f'{self.airline.name} Flight {self.flight_number} from {self.departure_airport.city} to {self.arrival_airport.city}'
-        plt.text(0.025, 0.975, title_string, fontweight='bold', fontsize='10', transform=fig.transFigure, color='white', ha='left', va='top')
-        [plt.text(0.025, 0.9725 - 0.02 * (j + 1), meta_text[j], **text_params) for j in range(len(meta_text))]
+        fig.text(0.025, 0.975, title_string, fontweight='bold', fontsize='10', color='white', ha='left', va='top')
+        [fig.text(0.025, 0.9725 - 0.02 * (j + 1), meta_text[j], **text_params) for j in range(len(meta_text))]
+        elapsed_text = fig.text(0.025, 0.9725 - 0.02 * (len(meta_text) + 1), '', **text_params)
 
-    def animate(self, save_directory: str, highres: bool = False):
+        # define the coordinate transform and imshow parameters
+        transform = ccrs.PlateCarree()
+        imshow_params = {'extent': [-180, 180, -90, 90], 'origin': 'upper', 'transform': transform}
+        if highres:
+            imshow_params['regrid_shape'] = (1280, 2560)
+
+        frames = []
+        for iterator in iterators:
+
+            # create high-resolution orthographic projection and place in an axis
+            projection = ccrs.Orthographic(central_longitude=self.flight_parameters.camera_path[iterator, 0],
+                                           central_latitude=self.flight_parameters.camera_path[iterator, 1])
+            self._highres_orthographic(projection)
+            ax = fig.add_axes([0.1, 0.1, 0.8, 0.8], projection=projection, facecolor='k')
+
+            # display the Earth surface image for current time in the flight
+            sub_solar_latitude, sub_solar_longitude = self.flight_parameters.subsolar_path[iterator]
+            surface_image = _get_day_night_map(round(float(sub_solar_latitude)), round(float(sub_solar_longitude)))
+            ax.imshow(surface_image, **imshow_params)
+
+            # plot the red flight path and point indicating the position of the plane
+            ax.plot(self.flight_parameters.flight_path[:iterator, 0], self.flight_parameters.flight_path[:iterator, 1],
+                    linewidth=2, color='tab:red', transform=transform)
+            ax.scatter([self.flight_parameters.flight_path[iterator, 0]],
+                       [self.flight_parameters.flight_path[iterator, 1]],
+                       s=15, color='tab:red', edgecolor='none', transform=transform)
+
+            # update the elapsed time
+            elapsed_text.set_text(fr'$\bf Flight\ Time\ Elapsed:$ {int(divmod(iterator, 60)[0])}h '
+                                  fr'{int(divmod(iterator, 60)[1]):0>2}m')
+
+            # draw the figure, grab the pixels, then remove the axis for the next frame
+            canvas.draw()
+            frames.append(np.asarray(canvas.buffer_rgba())[:, :, :3].copy())
+            ax.remove()
+
+        return frames
+
+    def _render_in_order(self, pool, blocks: list, highres: bool, window: int):
 
         """
-        This method generates and saves an animation of the simulated flight.
+        This method renders blocks of frames in the pool and yields the frames in order. At most `window` blocks are
+        submitted ahead of the one being written, so rendered frames (about 7.7 MB each) can't pile up in memory when
+        the video writer is slower than the workers.
+        """
+
+        render = partial(self._render_frames, highres=highres)
+        blocks = iter(blocks)
+        submitted = deque(pool.apply_async(render, (block,)) for block in islice(blocks, window))
+        while submitted:
+            rendered = submitted.popleft().get()
+            for block in islice(blocks, 1):
+                submitted.append(pool.apply_async(render, (block,)))
+            yield from rendered
+
+    def animate(self, save_directory: str, highres: bool = False, n_cores: int = None):
+
+        """
+        This method generates and saves an animation of the simulated flight. The frames are rendered in parallel, then
+        written to the video in order.
 
         Parameters
         ----------
@@ -574,6 +813,8 @@ class Flight:
             The absolute path to the directory where you want to save the animation.
         highres
             Whether or not you want the animation to be at better resolution.
+        n_cores
+            If desired, the user-specified number of cores to use for rendering frames.
 
         Examples
         --------
@@ -593,12 +834,19 @@ class Flight:
         # record starting time
         t0 = time.time()
 
-        # make a figure and set the coordinate transform
-        fig = plt.figure(figsize=(8, 8), facecolor='k', dpi=200)
+        # start rendering frames in the background (before any pyplot figures exist in this process)
+        if n_cores is None:
+            n_cores = get_appropriate_number_of_cores()
+        pool = get_multiprocessing_pool(n_cores)
+        n_frames = self.flight_parameters.n_frames
+        blocks = [range(start, min(start + 8, n_frames)) for start in range(0, n_frames, 8)]
+        frames = self._render_in_order(pool, blocks, highres, window=n_cores + 1)
 
-        # make the animation
-        ani = animation.FuncAnimation(fig, self._func_animate, frames=self.flight_parameters.n_frames,
-                                      fargs=(t0, highres), interval=41.67, repeat=False)
+        # make a figure to hand the rendered frames to the video writer at their native size
+        fig = plt.figure(figsize=(8, 8), facecolor='k', dpi=200)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_axis_off()
+        image = None
 
         # make the filename and path for saving
         ext = ''
@@ -606,6 +854,19 @@ class Flight:
             ext = '_highres'
         save_name = f"{self.airline.ICAO}{self.flight_number}_{datetime.strftime(self.departure_time, '%Y-%m-%d')}{ext}.mp4"
 
-        # save the animation
-        ani.save(os.path.join(save_directory, save_name), savefig_kwargs={'facecolor': fig.get_facecolor()})
+        # save the animation, stopping the workers if writing fails
+        writer = animation.FFMpegWriter(fps=24)
+        try:
+            with writer.saving(fig, os.path.join(save_directory, save_name), dpi=200):
+                for iterator, frame in enumerate(frames):
+                    if image is None:
+                        image = ax.imshow(frame, interpolation='none')
+                    else:
+                        image.set_data(frame)
+                    writer.grab_frame(facecolor=fig.get_facecolor())
+                    self._print_progress(iterator, t0)
+            cleanup_parallel_processing(pool)
+        finally:
+            pool.terminate()
+        plt.close(fig)
         print('\n')
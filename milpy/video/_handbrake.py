@@ -1,12 +1,72 @@
-from milpy.miscellaneous import EscapedString, ValidatePath, ValidateDirectory
+import shlex
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from milpy.miscellaneous import ValidatePath, ValidateDirectory
 from milpy.terminal_interface import construct_terminal_commands, path_to_system_executable
 
 
+@lru_cache(maxsize=None)
 def path_to_handbrake_cli():
     return path_to_system_executable("video/anc/HandBrakeCLI")
 
 
-class SourceOptions:
+def _opt(flag: str, value=None) -> str:
+    """Format a single HandBrakeCLI flag, with its value if it has one."""
+    return f"--{flag}" if value is None else f"--{flag}={value}"
+
+
+def _or_same_as_source(value) -> str:
+    """Display an unset option as inherited from the source."""
+    return 'Same as source' if value is None else value
+
+
+def _keep_options(options) -> tuple:
+    """The flags which apply, skipping any left empty."""
+    return tuple(option for option in options if option)
+
+
+class _Options(ABC):
+
+    """
+    Shared behavior of the HandBrakeCLI option classes. The arguments are
+    built once and reused until any option is changed.
+    """
+
+    __slots__ = ('_cmd_cache',)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, '_cmd_cache', None)
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return self.construct_terminal_commands()
+
+    @abstractmethod
+    def _build_arguments(self) -> tuple:
+        pass
+
+    def arguments(self) -> tuple:
+
+        """
+        Returns the options as HandBrakeCLI arguments, one per flag and
+        unquoted, for running HandBrakeCLI without a shell.
+        """
+
+        if self._cmd_cache is None:
+            object.__setattr__(self, '_cmd_cache', self._build_arguments())
+        return self._cmd_cache
+
+    def construct_terminal_commands(self) -> str:
+
+        """
+        Returns the options as a set of HandBrakeCLI flags and options.
+        """
+
+        return construct_terminal_commands(shlex.quote(argument)
+                                           for argument in self.arguments())
+
+
+class SourceOptions(_Options):
 
     """
     This class stores video source options.
@@ -15,7 +75,9 @@ class SourceOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
-    def __init__(self, input_file: str, title="1"):
+    __slots__ = ('_input', 'title')
+
+    def __init__(self, input_file: str, title="1", check_exists=True):
 
         """
         Parameters
@@ -24,30 +86,23 @@ class SourceOptions:
             The location of the video source, either a DVD or Blu-ray disc image in `.iso` format or a video file.
         title
             The video title to convert.
+        check_exists
+            Whether to check that the source exists. Only turn this off for a path that has already been checked.
         """
 
-        self._input = EscapedString(input_file)
-        ValidatePath(self._input.original)
+        self._input = ValidatePath(input_file) if check_exists else str(input_file)
         self.title = title
 
     def __str__(self):
         return f"Source options:\n"\
-               f"   Input: {self._input.original}\n"\
+               f"   Input: {self._input}\n"\
                f"   Title: {self.title}"
 
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
-    def construct_terminal_commands(self) -> str:
-
-        """
-        Returns the options as a set of HandBrakeCLI flags and options.
-        """
-
-        options = [f"--input={self._input}",
-                   f"--title={self.title}",
-                   f"--previews=1:0"]
-        return construct_terminal_commands(options)
+    def _build_arguments(self) -> tuple:
+        options = (_opt("input", self._input),
+                   _opt("title", self.title),
+                   _opt("previews", "1:0"))
+        return _keep_options(options)
 
     @property
     def input(self):
@@ -55,11 +110,10 @@ class SourceOptions:
 
     @input.setter
     def input(self, value):
-        self._input = EscapedString(value)
-        ValidatePath(self._input.original)
+        self._input = ValidatePath(value)
 
 
-class DestinationOptions:
+class DestinationOptions(_Options):
 
     """
     This class stores video destination options.
@@ -68,7 +122,10 @@ class DestinationOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
-    def __init__(self, output: str, chapters="1", video_format="av_mp4", optimize=True, align_av=True):
+    __slots__ = ('_output', 'format', 'chapters', 'chapter_names', 'optimize', 'align_av')
+
+    def __init__(self, output: str, chapters="1", chapter_names=None, video_format="av_mp4", optimize=True,
+                 align_av=True):
 
         """
         Parameters
@@ -77,7 +134,10 @@ class DestinationOptions:
             The absolute path with filename to where you want the converted video.
         chapters
             Whether or not to add chapter markers as defined in the source. If this is the string "include", then it puts in default
-            markers. If it is instead a path to a .csv file, then it labels the markers accordingly.
+            markers.
+        chapter_names
+            The path to a .csv file of chapter names to label the markers with. If given, it takes precedence over
+            `chapters`.
         video_format
             Video container format.
         optimize
@@ -87,44 +147,35 @@ class DestinationOptions:
             exactly the same time.
         """
 
-        self._output = EscapedString(output)
-        ValidateDirectory(self._output.original)
+        self._output = ValidateDirectory(output)
         self.format = video_format
         self.chapters = chapters
+        self.chapter_names = chapter_names
         self.optimize = optimize
         self.align_av = align_av
 
     def __str__(self):
         return f"Destination options:\n"\
-               f"   Output: {self._output.original}\n"\
+               f"   Output: {self._output}\n"\
                f"   Video format: {self.format}\n"\
                f"   Chapters: {self.chapters}\n"\
+               f"   Chapter names: {self.chapter_names}\n"\
                f"   Optimize: {self.optimize}\n"\
                f"   Align A/V: {self.align_av}"
 
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
-    def construct_terminal_commands(self):
-
-        """
-        Returns the options as a set of HandBrakeCLI flags and options.
-        """
-
-        options = [f"--output={self._output}",
-                   f"--format={self.format}",
-                   ]
-        if (self.chapters == "0") or (self.chapters == "1"):
-            options.append(f"--no-markers")
-        elif isinstance(self.chapters, EscapedString):
-            options.append(f"--markers={self.chapters}")
+    def _build_arguments(self) -> tuple:
+        if self.chapter_names is not None:
+            markers = _opt("markers", self.chapter_names)
+        elif (self.chapters == "0") or (self.chapters == "1"):
+            markers = _opt("no-markers")
         else:
-            options.append(f"--markers")
-        if self.optimize:
-            options.append(f"--optimize")
-        if self.align_av:
-            options.append(f"--align-av")
-        return construct_terminal_commands(options)
+            markers = _opt("markers")
+        options = (_opt("output", self._output),
+                   _opt("format", self.format),
+                   markers,
+                   self.optimize and _opt("optimize"),
+                   self.align_av and _opt("align-av"))
+        return _keep_options(options)
 
     @property
     def output(self):
@@ -132,11 +183,10 @@ class DestinationOptions:
 
     @output.setter
     def output(self, value):
-        self._output = EscapedString(value)
-        ValidateDirectory(self._output.original)
+        self._output = ValidateDirectory(value)
 
 
-class VideoOptions:
+class VideoOptions(_Options):
 
     """
     This class stores video encoder options.
@@ -145,7 +195,9 @@ class VideoOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
-    def __init__(self, encoder="x265", speed="fast", quality="20", two_pass=False):
+    __slots__ = ('encoder', 'speed', 'quality', 'two_pass', 'threads')
+
+    def __init__(self, encoder="x265", speed="fast", quality="20", two_pass=False, threads=None):
 
         """
         Parameters
@@ -159,12 +211,16 @@ class VideoOptions:
             Video quality factor. "20" is best for SD video, "22" for HD video.
         two_pass
             Whether or not to do an initial pass through the video to further optimize the conversion.
+        threads
+            The most threads an x264 or x265 encoder may use. By default the encoder uses every core, which is best for
+            one conversion at a time but oversubscribes the CPU when several run at once. Hardware encoders ignore it.
         """
 
         self.encoder = encoder
         self.speed = speed
         self.quality = quality
         self.two_pass = two_pass
+        self.threads = threads
 
     def __str__(self):
         return f"Video options:\n"\
@@ -172,25 +228,31 @@ class VideoOptions:
                f"   Speed (encoder preset): {self.speed}\n"\
                f"   Quality: {self.quality}\n"\
                f"   Two-pass: {self.two_pass}\n"\
+               f"   Encoder threads: {'automatic' if self.threads is None else self.threads}\n"\
                f"   Framerate: variable"
 
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
-    def construct_terminal_commands(self):
-
-        options = [f"--encoder={self.encoder}",
-                   f"--encoder-preset={self.speed}",
-                   f"--quality={self.quality}",
-                   f"--vfr"]
-        if self.two_pass:
-            options.append("--two-pass")
-            options.append("--turbo")
-
-        return construct_terminal_commands(options)
-
-
-class AudioOptions:
+    def _build_arguments(self) -> tuple:
+        options = (_opt("encoder", self.encoder),
+                   _opt("encoder-preset", self.speed),
+                   _opt("quality", self.quality),
+                   _opt("vfr"),
+                   self.two_pass and _opt("two-pass"),
+                   self.two_pass and _opt("turbo"),
+                   self._encoder_threads_option())
+        return _keep_options(options)
+
+    def _encoder_threads_option(self):
+        # x264 calls its thread count "threads"; x265 sizes its thread pool with "pools".
+        if self.threads is None:
+            return None
+        if str(self.encoder).startswith("x264"):
+            return _opt("encopts", f"threads={self.threads}")
+        if str(self.encoder).startswith("x265"):
+            return _opt("encopts", f"pools={self.threads}")
+        return None
+
+
+class AudioOptions(_Options):
 
     # TODO: I haven't yet figured out how to get double quotation marks into an
     #  audio track name. So far I have to edit them manually with Subler.
@@ -202,7 +264,9 @@ class AudioOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
-    def __init__(self, audio_titles="1", encoder="ca_aac", bitrates=None, mixdowns=None, sample_rates=None, track_names='None'):
+    __slots__ = ('audio_titles', 'encoder', 'bitrates', 'mixdowns', 'sample_rates', 'track_names')
+
+    def __init__(self, audio_titles="1", encoder="ca_aac", bitrates=None, mixdowns=None, sample_rates=None, track_names=None):
 
         """
         Parameters
@@ -234,35 +298,25 @@ class AudioOptions:
         self.track_names = track_names
 
     def __str__(self):
-        print_string = f"Audio options:\n"\
-                       f"   Audio titles: {self.audio_titles}\n"\
-                       f"   Encoder: {self.encoder}\n"\
-                       f"   Bitrate(s) (kbps): {self.bitrates}\n"\
-                       f"   Mixdown(s): {self.mixdowns}\n"\
-                       f"   Sample rate(s) (kHz): {self.sample_rates}\n"\
-                       f"   Track name(s): {self.track_names}"
-        return print_string.replace('None', 'Same as source')
-
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
-    def construct_terminal_commands(self):
-
-        options = [f"--audio={self.audio_titles}",
-                   f"--aencoder={self.encoder}"]
-        if self.bitrates is not None:
-            options.append(f"--ab={self.bitrates}")
-        if self.mixdowns is not None:
-            options.append(f"--mixdown={self.mixdowns}")
-        if self.sample_rates is not None:
-            options.append(f"--arate={self.sample_rates}")
-        if self.track_names != 'None':
-            options.append(f"--aname={EscapedString(self.track_names)}")
+        return f"Audio options:\n"\
+               f"   Audio titles: {self.audio_titles}\n"\
+               f"   Encoder: {self.encoder}\n"\
+               f"   Bitrate(s) (kbps): {_or_same_as_source(self.bitrates)}\n"\
+               f"   Mixdown(s): {_or_same_as_source(self.mixdowns)}\n"\
+               f"   Sample rate(s) (kHz): {_or_same_as_source(self.sample_rates)}\n"\
+               f"   Track name(s): {_or_same_as_source(self.track_names)}"
 
-        return construct_terminal_commands(options)
+    def _build_arguments(self) -> tuple:
+        options = (_opt("audio", self.audio_titles),
+                   _opt("aencoder", self.encoder),
+                   self.bitrates is not None and _opt("ab", self.bitrates),
+                   self.mixdowns is not None and _opt("mixdown", self.mixdowns),
+                   self.sample_rates is not None and _opt("arate", self.sample_rates),
+                   self.track_names is not None and _opt("aname", self.track_names))
+        return _keep_options(options)
 
 
-class PictureOptions:
+class PictureOptions(_Options):
 
     """
     This class stores video picture options.
@@ -271,6 +325,8 @@ class PictureOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
+    __slots__ = ('width', 'height', 'crop')
+
     def __init__(self, width=None, height=None, crop="0:0:0:0"):
 
         """
@@ -290,33 +346,26 @@ class PictureOptions:
         self.crop = crop
 
     def __str__(self):
-        print_string = f"Picture options:\n"\
-                       f"   Width: {self.width}\n"\
-                       f"   Height: {self.height}\n"\
-                       f"   Crop: {self.crop}\n"\
-                       f"   Anamorphic: off\n"\
-                       f"   Comb-detection: on\n"\
-                       f"   Decomb method: bob"
-        return print_string.replace('None', 'Same as source')
-
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
-    def construct_terminal_commands(self):
-        options = ["--non-anamorphic",
-                   "--comb-detect",
-                   "--decomb=\"bob\"",
-                   f"--crop={self.crop}"]
-        if self.width is not None:
-            options.append(f"--width={self.width}")
-            options.append(f"--display-width={self.width}")
-        if self.height is not None:
-            options.append(f"--height={self.height}")
-
-        return construct_terminal_commands(options)
-
-
-class SubtitleOptions:
+        return f"Picture options:\n"\
+               f"   Width: {_or_same_as_source(self.width)}\n"\
+               f"   Height: {_or_same_as_source(self.height)}\n"\
+               f"   Crop: {self.crop}\n"\
+               f"   Anamorphic: off\n"\
+               f"   Comb-detection: on\n"\
+               f"   Decomb method: bob"
+
+    def _build_arguments(self) -> tuple:
+        options = (_opt("non-anamorphic"),
+                   _opt("comb-detect"),
+                   _opt("decomb", "bob"),
+                   _opt("crop", self.crop),
+                   self.width is not None and _opt("width", self.width),
+                   self.width is not None and _opt("display-width", self.width),
+                   self.height is not None and _opt("height", self.height))
+        return _keep_options(options)
+
+
+class SubtitleOptions(_Options):
 
     """
     This class stores subtitle options. For now, you can only choose one subtitle track and it is burned-in.
@@ -325,7 +374,9 @@ class SubtitleOptions:
     https://handbrake.fr/docs/en/latest/cli/command-line-reference.html
     """
 
-    def __init__(self, subtitle_tracks="None"):
+    __slots__ = ('_subtitles',)
+
+    def __init__(self, subtitle_tracks=None):
 
         """
         Parameters
@@ -337,7 +388,7 @@ class SubtitleOptions:
         self._subtitles = subtitle_tracks
 
     def __str__(self):
-        if self._subtitles != "None":
+        if self._subtitles is not None:
             print_string = f"Subtitle options:\n"\
                            f"   Track: {self._subtitles}\n"\
                            f"   Burned-in: on"
@@ -345,9 +396,6 @@ class SubtitleOptions:
             print_string = ''
         return print_string
 
-    def __repr__(self):
-        return self.construct_terminal_commands()
-
     @property
     def subtitles(self):
         return self._subtitles
@@ -356,14 +404,10 @@ class SubtitleOptions:
     def subtitles(self, value):
         self._subtitles = value
 
-    def construct_terminal_commands(self) -> str:
-
-        options = []
-        if self.subtitles != "None":
-            options.append(f"--subtitle={self.subtitles}")
-            options.append("--subtitle-burned")
-
-        return construct_terminal_commands(options)
+    def _build_arguments(self) -> tuple:
+        options = (self.subtitles is not None and _opt("subtitle", self.subtitles),
+                   self.subtitles is not None and _opt("subtitle-burned"))
+        return _keep_options(options)
 
 
 class VideoConversionOptions:
@@ -375,8 +419,10 @@ class VideoConversionOptions:
         Raised if the inputs are not of the proper options.
 
     """
-    def __init__(self, source, destination):
-        self.source = SourceOptions(source)
+    __slots__ = ('source', 'destination', 'video', 'audio', 'picture', 'subtitle')
+
+    def __init__(self, source, destination, check_source_exists=True):
+        self.source = SourceOptions(source, check_exists=check_source_exists)
         self.destination = DestinationOptions(destination)
         self.video = VideoOptions()
         self.audio = AudioOptions()
@@ -420,8 +466,21 @@ class VideoConversionOptions:
                f'{self.picture}\n' \
                f'{self.subtitle}'
 
+    def arguments(self) -> tuple:
+
+        """
+        Returns every option as HandBrakeCLI arguments, in the order source,
+        destination, video, audio, picture and subtitle. Each group reuses
+        its cached arguments, so changing one option only rebuilds its own
+        group.
+        """
+
+        return (self.source.arguments() + self.destination.arguments()
+                + self.video.arguments() + self.audio.arguments()
+                + self.picture.arguments() + self.subtitle.arguments())
+
     def _raise_exception_if_input_and_output_filenames_match(self):
-        if self.source.input.original == self.destination.output.original:
+        if self.source.input == self.destination.output:
             message = 'Input and output files cannot be the same! Either ' \
                       'change the output directory or give the input file a ' \
                       'temporary filename.'
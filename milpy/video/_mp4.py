@@ -0,0 +1,82 @@
+import os
+import struct
+
+
+def _iterate_atoms(file, end: int):
+    """Yield the type, payload start and payload end of each atom between the
+    current position and `end`."""
+    while file.tell() + 8 <= end:
+        start = file.tell()
+        size, kind = struct.unpack('>I4s', file.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', file.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - start
+        if size < header_size or start + size > end:
+            raise ValueError('Malformed MP4 atom.')
+        yield kind, start + header_size, start + size
+        file.seek(start + size)
+
+
+def _read_atom(file, path: tuple, end: int) -> bytes:
+    """The payload of the atom at `path`, e.g. (b'moov', b'mvhd'), or None if
+    the file doesn't have one."""
+    for kind, start, stop in _iterate_atoms(file, end):
+        if kind == path[0]:
+            file.seek(start)
+            if len(path) == 1:
+                return file.read(stop - start)
+            return _read_atom(file, path[1:], stop)
+    return None
+
+
+def _movie_length(movie_header: bytes) -> float:
+    if movie_header[0] == 1:
+        timescale, duration = struct.unpack_from('>IQ', movie_header, 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', movie_header, 12)
+    if timescale == 0:
+        raise ValueError('MP4 movie header has no timescale.')
+    return duration / timescale
+
+
+def _chapter_starts(chapter_list: bytes) -> list:
+    """Chapter start times in seconds from a Nero chapter list, which stores
+    them in units of 100 ns."""
+    offset = 8 if chapter_list[0] == 1 else 4
+    n_chapters = chapter_list[offset]
+    offset += 1
+    starts = []
+    for _ in range(n_chapters):
+        start, title_length = struct.unpack_from('>QB', chapter_list, offset)
+        starts.append(start / 10_000_000)
+        offset += 9 + title_length
+    return starts
+
+
+def count_mp4_chapters(path: str) -> int:
+    """
+    Count the chapters in an MP4 file's Nero chapter list (moov/udta/chpl)
+    without running HandBrakeCLI. Like the HandBrakeCLI scan count,
+    chapters that last one second are skipped.
+
+    Raises
+    ------
+    ValueError
+        Raised if the file has no Nero chapter list or isn't a readable MP4.
+    """
+    with open(path, 'rb') as file:
+        end = os.fstat(file.fileno()).st_size
+        try:
+            movie_header = _read_atom(file, (b'moov', b'mvhd'), end)
+            file.seek(0)
+            chapter_list = _read_atom(file, (b'moov', b'udta', b'chpl'), end)
+            if movie_header is None or chapter_list is None:
+                raise ValueError('The MP4 file has no Nero chapter list.')
+            starts = _chapter_starts(chapter_list)
+            ends = starts[1:] + [_movie_length(movie_header)]
+        except (struct.error, IndexError):
+            raise ValueError('Malformed MP4 file.')
+    return sum(int(stop - start) != 1 for start, stop in zip(starts, ends))
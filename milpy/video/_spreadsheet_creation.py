@@ -1,18 +1,15 @@
-import pandas as pd
+_TV_SPREADSHEET_COLUMNS = (
+    'Name', 'Artist', 'Album Artist', 'Album', 'Genre', 'Release Date', 'Track #', 'TV Show', 'TV Episode ID',
+    'TV Season', 'TV Episode #', 'TV Network', 'Description', 'Series Description', 'Copyright', 'Media Kind',
+    'Cover Art', 'Rating', 'Cast', 'Source', 'Destination', 'Title', 'Audio', 'Dimensions', 'Crop',
+    'Audio Bitrate', 'Audio Mixdown', 'Audio Track Names', 'HD Video', 'Quality Factor', 'Video Encoder',
+    'Encoder Preset', 'Subtitles', 'Chapters')
 
-
-def _tv_spreadsheet_columns():
-    return ['Name', 'Artist', 'Album Artist', 'Album', 'Genre', 'Release Date', 'Track #', 'TV Show', 'TV Episode ID',
-            'TV Season', 'TV Episode #', 'TV Network', 'Description', 'Series Description', 'Copyright', 'Media Kind',
-            'Cover Art', 'Rating', 'Cast', 'Source', 'Destination', 'Title', 'Audio', 'Dimensions', 'Crop',
-            'Audio Bitrate', 'Audio Mixdown', 'Audio Track Names', 'HD Video', 'Quality Factor', 'Subtitles', 'Chapters']
-
-
-def _movie_spreadsheet_columns():
-    return ['Name', 'Genre', 'Release Date', 'Description', 'Copyright', 'Media Kind', 'Cover Art', 'Rating',
-            'Rating Annotation', 'Cast', 'Director', 'Producers', 'Screenwriters', 'Source', 'Destination', 'Title',
-            'Audio', 'Dimensions', 'Crop', 'Audio Bitrate', 'Audio Mixdown', 'Audio Track Names', 'HD Video',
-            'Quality Factor', 'Subtitles', 'Chapters']
+_MOVIE_SPREADSHEET_COLUMNS = (
+    'Name', 'Genre', 'Release Date', 'Description', 'Copyright', 'Media Kind', 'Cover Art', 'Rating',
+    'Rating Annotation', 'Cast', 'Director', 'Producers', 'Screenwriters', 'Source', 'Destination', 'Title',
+    'Audio', 'Dimensions', 'Crop', 'Audio Bitrate', 'Audio Mixdown', 'Audio Track Names', 'HD Video',
+    'Quality Factor', 'Video Encoder', 'Encoder Preset', 'Subtitles', 'Chapters')
 
 
 def _columns_for_kind(kind):
@@ -21,10 +18,10 @@ def _columns_for_kind(kind):
 
     if (kind == 'tv') or (kind == 'television'):
         kind = 'tv'
-        columns = _tv_spreadsheet_columns()
+        columns = _TV_SPREADSHEET_COLUMNS
     elif (kind == 'movie') or (kind == 'film'):
         kind = 'movie'
-        columns = _movie_spreadsheet_columns()
+        columns = _MOVIE_SPREADSHEET_COLUMNS
     else:
         raise Exception("Unrecognized kind. Try 'tv' or 'movie'.")
 
@@ -32,6 +29,8 @@ def _columns_for_kind(kind):
 
 
 def _make_dataframe_from_columns(columns):
-    note = ['Make sure you change all cells to "Text" to avoid any Excel automated formatting shit.']
-    note.extend([''] * (len(columns) - 1))
-    return pd.DataFrame([note], columns=columns)
+    import numpy as np
+    import pandas as pd
+    row = np.full((1, len(columns)), '', dtype=object)
+    row[0, 0] = 'Make sure you change all cells to "Text" to avoid any Excel automated formatting shit.'
+    return pd.DataFrame(row, columns=columns)
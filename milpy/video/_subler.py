@@ -1,58 +1,112 @@
 import os
-import pandas as pd
-from milpy.miscellaneous import EscapedString
+from functools import lru_cache
 from milpy.terminal_interface import construct_terminal_commands, path_to_system_executable
 
 
+@lru_cache(maxsize=None)
 def path_to_subler_cli():
     return path_to_system_executable("video/anc/SublerCLI")
 
 
 def format_subler_metadata_from_dictionary(metadata_dictionary):
-    return ''.join([r'{%s:%s}' % (EscapedString(key),
-                                  EscapedString(value).replace(',', r'\,'))
-                    for key, value in metadata_dictionary.items()])
+    """Subler's {key:value} metadata string, unescaped, for use as a single
+    argument."""
+    return ''.join('{%s:%s}' % (key, value)
+                   for key, value in metadata_dictionary.items())
 
 
 def make_temporary_video(source_filepath):
-    temporary_filepath = list(os.path.splitext(source_filepath))
-    temporary_filepath[-1] = '_temp' + temporary_filepath[-1]
-    temporary_filepath = ''.join(temporary_filepath)
-    os.system(f'mv {EscapedString(source_filepath)} {EscapedString(temporary_filepath)}')
-    return EscapedString(temporary_filepath)
+    root, extension = os.path.splitext(source_filepath)
+    temporary_filepath = f'{root}_temp{extension}'
+    os.replace(source_filepath, temporary_filepath)
+    return temporary_filepath
+
+
+@lru_cache(maxsize=None)
+def _excel_engine():
+    """Use the Rust-backed calamine reader where pandas supports it (pandas
+    2.2+ with python-calamine installed), otherwise openpyxl."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return 'openpyxl'
+    import pandas as pd
+    major, minor = (int(part) for part in pd.__version__.split('.')[:2])
+    return 'calamine' if (major, minor) >= (2, 2) else 'openpyxl'
+
+
+# These are the spreadsheet components specific to Handbrake.
+_HANDBRAKE_KEYS = frozenset((
+    "Source", "Destination", "Title", "Audio", "Dimensions", "Crop",
+    "Audio Bitrate", "Audio Mixdown", "Audio Track Names", "Subtitles",
+    "Chapters", "Quality Factor", "Video Encoder", "Encoder Preset"))
+
+
+def _is_named_column(column):
+    """Columns without a header (pandas calls them "Unnamed: #") hold nothing
+    we tag or convert with, so they're never parsed."""
+    return not str(column).startswith('Unnamed:')
 
 
 class SpreadsheetLoader:
 
     def __init__(self, path_to_spreadsheet):
-        self.metadata: pd.DataFrame = pd.read_excel(path_to_spreadsheet, dtype=str)
+        # pandas is imported here so that building conversion options or
+        # tagging a single file doesn't pay for its (slow) import.
+        import pandas as pd
+        self.metadata: pd.DataFrame = pd.read_excel(
+            path_to_spreadsheet, dtype=str, engine=_excel_engine(),
+            usecols=_is_named_column)
         self.n_items = self.metadata.shape[0]
-
-    def _get_item_metadata(self, line):
-        item_df = self.metadata.iloc[line].dropna()
-        keys = item_df.keys().tolist()
-        values = item_df.tolist()
-        return zip(keys, values)
+        self._include_copyright_symbol()
+        handbrake_columns = [column for column in self.metadata.columns
+                             if column in _HANDBRAKE_KEYS]
+        subler_columns = [column for column in self.metadata.columns
+                          if column not in _HANDBRAKE_KEYS]
+        self._handbrake_rows = self._make_records(
+            self.metadata[handbrake_columns])
+        self._subler_rows = self._make_records(self.metadata[subler_columns])
+        # Tagging only needs each row's output file.
+        self.destinations = [row.get("Destination")
+                             for row in self._handbrake_rows]
 
     @staticmethod
-    def _include_copyright_symbol(subler_dictionary):
-        subler_dictionary['Copyright'] = f'\u00A9 {subler_dictionary["Copyright"]}'
-        return subler_dictionary
+    def _make_records(metadata):
+        """Each row as a dictionary, skipping empty cells."""
+        return [{key: value for key, value in record.items()
+                 if isinstance(value, str)}
+                for record in metadata.to_dict(orient='records')]
 
-    @staticmethod
-    def _handbrake_dictionary_keys():
-        """These are the spreadsheet components specific to Handbrake."""
-        return ["Source", "Destination", "Title", "Audio", "Dimensions",
-                "Crop", "Audio Bitrate", "Audio Mixdown", "Audio Track Names",
-                "Subtitles", "Chapters", "Quality Factor"]
+    def _include_copyright_symbol(self):
+        """Prefix the whole Copyright column at once; empty cells stay
+        empty."""
+        if 'Copyright' in self.metadata.columns:
+            self.metadata['Copyright'] = '\u00A9 ' + self.metadata['Copyright']
 
     def make_subler_dictionary(self, line):
-        subler_dictionary = {key: value
-                             for key, value in self._get_item_metadata(line)
-                             if key not in self._handbrake_dictionary_keys()}
-        return self._include_copyright_symbol(subler_dictionary)
+        return dict(self._subler_rows[line])
 
     def make_handbrake_dictionary(self, line):
-        return {key: value
-                for key, value in self._get_item_metadata(line)
-                if key in self._handbrake_dictionary_keys()}
+        return dict(self._handbrake_rows[line])
+
+    def make_all_dictionaries(self):
+        """The HandBrake and Subler dictionaries for every row, in order.
+        They are copies, since the loader is shared by every Spreadsheet made
+        from the same file."""
+        return ([dict(row) for row in self._handbrake_rows],
+                [dict(row) for row in self._subler_rows])
+
+
+@lru_cache(maxsize=4)
+def _load_spreadsheet(path_to_spreadsheet, modification_time):
+    return SpreadsheetLoader(path_to_spreadsheet)
+
+
+def load_spreadsheet(path_to_spreadsheet):
+    """
+    A SpreadsheetLoader for the file, parsed only once until the file is
+    modified. Keying on the modification time makes an edited spreadsheet
+    load fresh.
+    """
+    return _load_spreadsheet(path_to_spreadsheet,
+                             os.path.getmtime(path_to_spreadsheet))
@@ -1,14 +1,17 @@
 import os
-from pathlib import Path
-from milpy.miscellaneous import EscapedString
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, \
+    FIRST_COMPLETED
 from milpy.video._handbrake import path_to_handbrake_cli, \
     VideoConversionOptions
+from milpy.video._mp4 import count_mp4_chapters
 from milpy.video._subler import path_to_subler_cli, \
     format_subler_metadata_from_dictionary, make_temporary_video, \
-    SpreadsheetLoader
-from milpy.terminal_interface import construct_terminal_commands
-from milpy.parallel_processing import get_multiprocessing_pool, \
-    cleanup_parallel_processing
+    load_spreadsheet
+from milpy.parallel_processing import get_thread_pool_executor, \
+    get_appropriate_number_of_cores
 from milpy.video._spreadsheet_creation import _columns_for_kind, \
     _make_dataframe_from_columns
 import subprocess
@@ -17,42 +20,59 @@ import subprocess
 # TODO: Figure out why double quotes won't appear in HandbrakeCLI audio track
 #  names.
 
+# A chapter line in a HandBrakeCLI scan, skipping the one-second stubs some
+# discs pad their chapter lists with. Disc images also list title durations
+# in the same format, so for them only the indented chapter entries count.
+_CHAPTER_LINE = re.compile(rb': duration (?!00:00:01)')
+_ISO_CHAPTER_LINE = re.compile(rb'    \+ .*: duration (?!00:00:01)')
+
 
 class _VideoConverter:
-    def __init__(self, converter_options: VideoConversionOptions):
+    def __init__(self, converter_options: VideoConversionOptions,
+                 nice: int = None):
         self.options = converter_options
+        self.nice = nice
 
-    def _create_command_of_input_options(self):
-        return f'{path_to_handbrake_cli()} ' + \
-               f'{repr(self.options.source)} ' + \
-               f'{repr(self.options.destination)} ' + \
-               f'{repr(self.options.video)} ' + \
-               f'{repr(self.options.audio)} ' + \
-               f'{repr(self.options.picture)} ' + \
-               f'{repr(self.options.subtitle)} '
+    def _create_command_of_input_options(self) -> list:
+        return [path_to_handbrake_cli(), *self.options.arguments()]
 
     def _set_test_video_options(self):
         self.options.video.encoder = 'x264'
         self.options.video.speed = 'ultrafast'
 
     @staticmethod
-    def _add_30_second_test_to_options(options: str):
-        return f'{options} ' + '--start-at=seconds:0 ' + '--stop-at=seconds:30'
+    def _add_30_second_test_to_options(options: list):
+        return options + ['--start-at=seconds:0', '--stop-at=seconds:30']
+
+    def _run(self, command: list):
+        # Launch through nice(1) so the priority is set before HandBrakeCLI
+        # starts any encoder threads; on Linux niceness is per thread.
+        if self.nice is not None:
+            command = ['nice', '-n', str(self.nice)] + command
+        with subprocess.Popen(command) as process:
+            try:
+                process.wait()
+            except BaseException:
+                process.kill()
+                raise
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command)
 
     def convert(self):
         command = self._create_command_of_input_options()
-        os.system(command)
+        self._run(command)
 
     def test(self):
         self._set_test_video_options()
         options = self._create_command_of_input_options()
         options = self._add_30_second_test_to_options(options)
-        os.system(options)
+        self._run(options)
 
 
 class _File(str):
 
-    def __new__(cls, path: str, extension: str, *args, **kwargs):
+    def __new__(cls, path: str, extension: str, *args,
+                check_exists: bool = True, **kwargs):
 
         """
         Instances of this class represent a file that exists on this computer.
@@ -63,6 +83,9 @@ class _File(str):
             The absolute path to a file on this computer.
         extension
             The extension the input path must have.
+        check_exists
+            Whether to check that the file exists. Callers that have already
+            checked can skip the extra filesystem lookup.
 
         Raises
         ------
@@ -72,35 +95,43 @@ class _File(str):
             Raised if the input file path does not have the specified extension.
         """
 
-        cls._raise_value_error_if_path_does_not_exist(path)
-        cls._raise_type_error_if_input_has_wrong_extension(path, extension)
+        cls._validate(path, extension, check_exists)
         return super().__new__(cls, path, *args, **kwargs)
 
     @staticmethod
-    def _raise_value_error_if_path_does_not_exist(path: str):
-        if not Path(path).exists():
-            message = 'The input file path does not exist.'
-            raise ValueError(message)
-
-    @staticmethod
-    def _raise_type_error_if_input_has_wrong_extension(path: str, ext: str):
-        if Path(path).suffix != f'.{ext}':
-            message = f'The input file path is not a {ext} file.'
+    def _validate(path: str, extension: str, check_exists: bool):
+        if check_exists:
+            try:
+                os.stat(path)
+            except (FileNotFoundError, NotADirectoryError):
+                message = 'The input file path does not exist.'
+                raise ValueError(message) from None
+        if not path.lower().endswith(f'.{extension}'):
+            message = f'The input file path is not a {extension} file.'
             raise TypeError(message)
 
 
-class AVI:
+class _BaseVideo:
     """
-    Instances of this class represent an MP4 file which is accessible to
-    the computer.
+    The behaviour shared by every kind of video file this module handles.
+    Subclasses set the file extension they accept, the suffix used to name
+    the default converted file and the pattern matching a chapter line in a
+    HandBrakeCLI scan.
     """
 
-    def __init__(self, file_path: str):
+    _extension = None
+    _converted_suffix = None
+    _chapter_line = _CHAPTER_LINE
+
+    def __init__(self, file_path: str, check_exists: bool = True):
         """
         Parameters
         ----------
         file_path
-            The absolute path to a AVI file.
+            The absolute path to the video file.
+        check_exists
+            Whether to check that the file exists. Only turn this off for a
+            path you've already checked.
 
         Raises
         ------
@@ -108,131 +139,87 @@ class AVI:
             Raised if the input file path points to a file that does not exist
             or is inaccessible to the computer.
         TypeError
-            Raised if the input file path does not have a `.avi` extension.
+            Raised if the input file path does not have the extension of this
+            kind of video.
         """
-        self.file_path = _File(file_path, 'avi')
-        self.terminal_file_path = EscapedString(file_path)
+        self.file_path = _File(file_path, self._extension,
+                               check_exists=check_exists)
         self.converter_options = self._set_converter_options()
 
     def _set_converter_options(self):
-        file_extension = Path(self.file_path).suffix
-        destination = self.file_path.replace(file_extension,
-                                             '_converted' + file_extension)
-        converter_options = VideoConversionOptions(self.file_path, destination)
+        # _File guarantees the path ends with ".<extension>" and has already
+        # checked (or been told to skip checking) that it exists.
+        root = self.file_path[:-len(self._extension) - 1]
+        destination = root + self._converted_suffix
+        converter_options = VideoConversionOptions(
+            self.file_path, destination, check_source_exists=False)
         return converter_options
 
-    def inspect_metadata(self):
-        """
-        Examine any existing metadata in an MP4 file.
-        """
-        command = f'{path_to_subler_cli()} -source {self.terminal_file_path} -listmetadata'
-        os.system(command)
-
-    def convert(self):
+    def convert(self, nice: int = None):
         """
         Convert the video using the parameters in the `converter_options`
         attribute.
+
+        Parameters
+        ----------
+        nice
+            If desired, the scheduling priority (niceness) to run HandBrakeCLI
+            at, from -20 (highest) to 19 (lowest). Values below zero need
+            administrator privileges.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            Raised if HandBrakeCLI fails.
         """
-        converter = _VideoConverter(self.converter_options)
+        converter = _VideoConverter(self.converter_options, nice)
         converter.convert()
 
-    def test_convert(self):
+    def test_convert(self, nice: int = None):
         """
         Run a test video conversion using 10 seconds at high speed.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.test()
-
-    def tag(self, metadata_dictionary: dict):
-        """
-        Tag the video with the keys and values in the provided dictionary.
 
         Parameters
         ----------
-        metadata_dictionary
-            The metadata tags and values.
+        nice
+            If desired, the scheduling priority (niceness) to run HandBrakeCLI
+            at.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            Raised if HandBrakeCLI fails.
         """
-        temporary_filepath = make_temporary_video(self.file_path)
-        metadata = format_subler_metadata_from_dictionary(metadata_dictionary)
-        options = [path_to_subler_cli(),
-                   f"-source {temporary_filepath}",
-                   f"-dest {EscapedString(self.file_path)}",
-                   f"-metadata {metadata}",
-                   f"-language English"]
-        os.system(construct_terminal_commands(options))
-        os.remove(temporary_filepath.original)
+        converter = _VideoConverter(self.converter_options, nice)
+        converter.test()
 
     def get_number_of_chapters(self):
-        cmd = f"{path_to_handbrake_cli()} --input={self.terminal_file_path} " \
-              f"--title={self.converter_options.source.title} --scan"
-        cp = subprocess.Popen(cmd, stderr=subprocess.PIPE,
-                              stdout=subprocess.PIPE, shell=True)
-        chapters = [line.decode("utf-8").replace('\n', '').strip()
-                    for line in cp.stderr.readlines()
-                    if ": duration " in line.decode("utf-8")
-                    and '00:00:01' not in line.decode("utf-8")]
-        number_of_chapters = len(chapters)
+        command = [path_to_handbrake_cli(), f'--input={self.file_path}',
+                   f'--title={self.converter_options.source.title}', '--scan']
+        cp = subprocess.Popen(command, stderr=subprocess.PIPE,
+                              stdout=subprocess.DEVNULL)
+        number_of_chapters = 0
+        for line in cp.stderr:
+            if self._chapter_line.search(line):
+                number_of_chapters += 1
         cp.stderr.close()
-        cp.stdout.close()
         cp.wait()
         return str(number_of_chapters)
 
 
-class MP4:
+class _TaggableVideo(_BaseVideo):
     """
-    Instances of this class represent an MP4 file which is accessible to
-    the computer.
+    A video in a container SublerCLI can read and write metadata for.
     """
 
-    def __init__(self, file_path: str):
-        """
-        Parameters
-        ----------
-        file_path
-            The absolute path to a MP4 file.
-
-        Raises
-        ------
-        ValueError
-            Raised if the input file path points to a file that does not exist
-            or is inaccessible to the computer.
-        TypeError
-            Raised if the input file path does not have a `.mp4` extension.
-        """
-        self.file_path = _File(file_path, 'mp4')
-        self.terminal_file_path = EscapedString(file_path)
-        self.converter_options = self._set_converter_options()
-
-    def _set_converter_options(self):
-        file_extension = Path(self.file_path).suffix
-        destination = self.file_path.replace(file_extension,
-                                             '_converted' + file_extension)
-        converter_options = VideoConversionOptions(self.file_path, destination)
-        return converter_options
-
     def inspect_metadata(self):
         """
         Examine any existing metadata in an MP4 file.
         """
-        command = f'{path_to_subler_cli()} -source {self.terminal_file_path} -listmetadata'
-        os.system(command)
-
-    def convert(self):
-        """
-        Convert the video using the parameters in the `converter_options`
-        attribute.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.convert()
-
-    def test_convert(self):
-        """
-        Run a test video conversion using 10 seconds at high speed.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.test()
+        subprocess.run([path_to_subler_cli(), '-source', self.file_path,
+                        '-listmetadata'])
 
-    def tag(self, metadata_dictionary: dict):
+    def tag(self, metadata_dictionary: dict, in_place: bool = False):
         """
         Tag the video with the keys and values in the provided dictionary.
 
@@ -240,156 +227,93 @@ class MP4:
         ----------
         metadata_dictionary
             The metadata tags and values.
+        in_place
+            If True, have SublerCLI update the metadata in the file itself
+            instead of writing a tagged copy from a temporary file. This
+            skips copying the whole video, which matters for large files that
+            only need their metadata changed.
+
+        Raises
+        ------
+        subprocess.CalledProcessError
+            Raised if SublerCLI fails. Unless tagging in place, the untagged
+            video is restored first.
         """
-        temporary_filepath = make_temporary_video(self.file_path)
         metadata = format_subler_metadata_from_dictionary(metadata_dictionary)
+        if in_place:
+            # With -dest naming an existing file and no -source, SublerCLI
+            # updates that file's metadata instead of writing a new one.
+            subprocess.run([path_to_subler_cli(),
+                            "-dest", self.file_path,
+                            "-metadata", metadata], check=True)
+            return
+        temporary_filepath = make_temporary_video(self.file_path)
         options = [path_to_subler_cli(),
-                   f"-source {temporary_filepath}",
-                   f"-dest {EscapedString(self.file_path)}",
-                   f"-metadata {metadata}",
-                   f"-language English"]
-        os.system(construct_terminal_commands(options))
-        os.remove(temporary_filepath.original)
+                   "-source", temporary_filepath,
+                   "-dest", self.file_path,
+                   "-metadata", metadata,
+                   "-language", "English"]
+        try:
+            subprocess.run(options, check=True)
+        except BaseException:
+            # Put the untagged original back over whatever SublerCLI left.
+            os.replace(temporary_filepath, self.file_path)
+            raise
+        os.remove(temporary_filepath)
+
+
+class AVI(_TaggableVideo):
+    """
+    Instances of this class represent an AVI file which is accessible to
+    the computer.
+    """
 
-    def get_number_of_chapters(self):
-        cmd = f"{path_to_handbrake_cli()} --input={self.terminal_file_path} " \
-              f"--title={self.converter_options.source.title} --scan"
-        cp = subprocess.Popen(cmd, stderr=subprocess.PIPE,
-                              stdout=subprocess.PIPE, shell=True)
-        chapters = [line.decode("utf-8").replace('\n', '').strip()
-                    for line in cp.stderr.readlines()
-                    if ": duration " in line.decode("utf-8")
-                    and '00:00:01' not in line.decode("utf-8")]
-        number_of_chapters = len(chapters)
-        cp.stderr.close()
-        cp.stdout.close()
-        cp.wait()
-        return str(number_of_chapters)
+    _extension = 'avi'
+    _converted_suffix = '_converted.avi'
 
 
-class MKV:
+class MP4(_TaggableVideo):
     """
-    Instances of this class represent an MKV file which is accessible to
+    Instances of this class represent an MP4 file which is accessible to
     the computer.
     """
 
-    def __init__(self, file_path: str):
-        """
-        Parameters
-        ----------
-        file_path
-            The absolute path to an MKV file.
+    _extension = 'mp4'
+    _converted_suffix = '_converted.mp4'
 
-        Raises
-        ------
-        ValueError
-            Raised if the input file path points to a file that does not exist
-            or is inaccessible to the computer.
-        TypeError
-            Raised if the input file path does not have a `.mkv` extension.
-        """
-        self.file_path = _File(file_path, 'mkv')
-        self.terminal_file_path = EscapedString(file_path)
-        self.converter_options = self._set_converter_options()
-
-    def _set_converter_options(self):
-        file_extension = Path(self.file_path).suffix
-        destination = self.file_path.replace(file_extension, '_converted.mp4')
-        converter_options = VideoConversionOptions(self.file_path, destination)
-        return converter_options
+    def get_number_of_chapters(self):
+        # Reading the chapter list straight from the file is much faster
+        # than a HandBrakeCLI scan, which is still used for files without a
+        # Nero chapter list.
+        try:
+            return str(count_mp4_chapters(self.file_path))
+        except (OSError, ValueError):
+            return super().get_number_of_chapters()
 
-    def convert(self):
-        """
-        Convert the video using the parameters in the `converter_options`
-        attribute.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.convert()
 
-    def test_convert(self):
-        """
-        Run a test video conversion using 10 seconds at high speed.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.test()
+class MKV(_BaseVideo):
+    """
+    Instances of this class represent an MKV file which is accessible to
+    the computer.
+    """
 
-    def get_number_of_chapters(self):
-        cmd = f"{path_to_handbrake_cli()} --input={self.terminal_file_path} " \
-              f"--title={self.converter_options.source.title} --scan"
-        cp = subprocess.Popen(cmd, stderr=subprocess.PIPE,
-                              stdout=subprocess.PIPE, shell=True)
-        chapters = [line.decode("utf-8").replace('\n', '').strip()
-                    for line in cp.stderr.readlines()
-                    if ": duration " in line.decode("utf-8")
-                    and '00:00:01' not in line.decode("utf-8")]
-        number_of_chapters = len(chapters)
-        cp.stderr.close()
-        cp.stdout.close()
-        cp.wait()
-        return str(number_of_chapters)
+    _extension = 'mkv'
+    _converted_suffix = '_converted.mp4'
 
 
-class ISO:
+class ISO(_BaseVideo):
     """
     Instances of this class represent a Blu-ray or DVD disc image in ISO
     format.
     """
 
-    def __init__(self, file_path: str):
-        """
-        Parameters
-        ----------
-        file_path
-            The absolute path to an ISO file on this computer.
+    _extension = 'iso'
+    _converted_suffix = ', Title 1 (Converted).mp4'
+    _chapter_line = _ISO_CHAPTER_LINE
 
-        Raises
-        ------
-        ValueError
-            Raised if the input file path points to a file that does not exist
-            or is inaccessible to the computer.
-        TypeError
-            Raised if the input file path does not have a `.iso` extension.
-        """
-        self.file_path = _File(file_path, 'iso')
-        self.terminal_file_path = EscapedString(file_path)
-        self.converter_options = self._set_converter_options()
 
-    def _set_converter_options(self):
-        file_extension = Path(self.file_path).suffix
-        destination = self.file_path.replace(file_extension,
-                                             ', Title 1 (Converted).mp4')
-        converter_options = VideoConversionOptions(self.file_path, destination)
-        return converter_options
-
-    def convert(self):
-        """
-        Convert the video using the parameters in the `converter_options`
-        attribute.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.convert()
-
-    def test_convert(self):
-        """
-        Run a test video conversion using 10 seconds at high speed.
-        """
-        converter = _VideoConverter(self.converter_options)
-        converter.test()
-
-    def get_number_of_chapters(self):
-        cmd = f"{path_to_handbrake_cli()} --input={self.terminal_file_path} " \
-              f"--title={self.converter_options.source.title} --scan"
-        cp = subprocess.Popen(cmd, stderr=subprocess.PIPE,
-                              stdout=subprocess.PIPE, shell=True)
-        chapters = [line.decode("utf-8").replace('\n', '') for line in
-                    cp.stderr.readlines() if "    + " in line.decode("utf-8")
-                    and ": duration " in line.decode("utf-8")
-                    and '00:00:01' not in line.decode("utf-8")]
-        number_of_chapters = len(chapters)
-        cp.stderr.close()
-        cp.stdout.close()
-        cp.wait()
-        return str(number_of_chapters)
+# The video class for each source file extension a spreadsheet can use.
+_VIDEO_TYPES = {'.avi': AVI, '.iso': ISO, '.mkv': MKV, '.mp4': MP4}
 
 
 class Spreadsheet:
@@ -406,69 +330,218 @@ class Spreadsheet:
             The absolute path to the spreadsheet. To make a blank spreadsheet,
             use the function `make_empty_metadata_spreadsheet()`.
         """
-        self.spreadsheet = SpreadsheetLoader(path_to_spreadsheet)
+        self.spreadsheet = load_spreadsheet(path_to_spreadsheet)
+        self._chapter_cache = {}
+        self._validated_sources = set()
 
     @staticmethod
-    def _get_source_type(source_filepath: str):
-        extension = os.path.splitext(source_filepath)[1]
-        if extension == ".mp4":
-            return MP4(source_filepath)
-        elif extension == ".mkv":
-            return MKV(source_filepath)
-        elif extension == ".iso":
-            return ISO(source_filepath)
-        elif extension == ".avi":
-            return AVI(source_filepath)
-        else:
-            raise Exception('Bad input file type.')
-
-    def _set_source_parameters(self, item: int):
-        handbrake_metadata = self.spreadsheet.make_handbrake_dictionary(item)
-        video = self._get_source_type(handbrake_metadata["Source"])
-        video.converter_options.source.title = handbrake_metadata["Title"]
-        video.converter_options.source.quality = handbrake_metadata["Quality Factor"]
-        video.converter_options.destination.output = handbrake_metadata["Destination"]
+    def _get_source_type(source_filepath: str, check_exists: bool = True):
+        extension = os.path.splitext(source_filepath)[1].lower()
+        video_type = _VIDEO_TYPES.get(extension)
+        if video_type is None:
+            raise ValueError('Bad input file type.')
+        return video_type(source_filepath, check_exists)
+
+    def _set_source_parameters(self, item: int,
+                               handbrake_metadata: dict = None):
+        if handbrake_metadata is None:
+            handbrake_metadata = \
+                self.spreadsheet.make_handbrake_dictionary(item)
+        video = self._get_video(handbrake_metadata["Source"])
+        options = video.converter_options
+        options.source.title = handbrake_metadata["Title"]
+        video_options = options.video
+        video_options.quality = handbrake_metadata["Quality Factor"]
+        if "Video Encoder" in handbrake_metadata:
+            video_options.encoder = handbrake_metadata["Video Encoder"]
+        if "Encoder Preset" in handbrake_metadata:
+            video_options.speed = handbrake_metadata["Encoder Preset"]
+        destination = options.destination
+        destination.output = handbrake_metadata["Destination"]
         if "Chapters" in handbrake_metadata:
-            video.converter_options.destination.chapters = EscapedString(handbrake_metadata["Chapters"])
+            destination.chapter_names = handbrake_metadata["Chapters"]
         else:
-            video.converter_options.destination.chapters = video.get_number_of_chapters()
-        video.converter_options.audio.audio_titles = handbrake_metadata["Audio"]
-        video.converter_options.audio.bitrates = handbrake_metadata["Audio Bitrate"]
-        video.converter_options.audio.mixdowns = handbrake_metadata["Audio Mixdown"]
-        video.converter_options.audio.track_names = handbrake_metadata["Audio Track Names"]
-        video.converter_options.picture.width = handbrake_metadata["Dimensions"].split("x")[0]
-        video.converter_options.picture.height = handbrake_metadata["Dimensions"].split("x")[1]
-        video.converter_options.picture.crop = handbrake_metadata["Crop"]
+            destination.chapter_names = None
+            if item in self._chapter_cache:
+                destination.chapters = self._chapter_cache[item]
+            else:
+                destination.chapters = video.get_number_of_chapters()
+        audio = options.audio
+        audio.audio_titles = handbrake_metadata["Audio"]
+        audio.bitrates = handbrake_metadata["Audio Bitrate"]
+        audio.mixdowns = handbrake_metadata["Audio Mixdown"]
+        audio.track_names = handbrake_metadata["Audio Track Names"]
+        picture = options.picture
+        picture.width, picture.height = \
+            handbrake_metadata["Dimensions"].split("x", 1)
+        picture.crop = handbrake_metadata["Crop"]
         if "Subtitles" in handbrake_metadata:
-            video.converter_options.subtitle.subtitles = handbrake_metadata["Subtitles"]
+            options.subtitle.subtitles = handbrake_metadata["Subtitles"]
         return video
 
-    def _parallel_convert(self, item):
-        video = self._set_source_parameters(item)
-        video.convert()
+    def _get_video(self, source_filepath: str):
+        return self._get_source_type(
+            source_filepath,
+            check_exists=source_filepath not in self._validated_sources)
 
-    def _test_parallel_convert(self, item):
-        video = self._set_source_parameters(item)
-        video.test_convert()
+    def _prevalidate_sources(self):
+        """
+        Check that every source exists before any work starts, looking them
+        up concurrently so slow (e.g., network) storage is only waited on
+        once. Sources found here aren't checked again when each item's video
+        is made.
+
+        Raises
+        ------
+        ValueError
+            Raised if any source doesn't exist, listing all of them.
+        """
+        sources = {handbrake_metadata["Source"] for handbrake_metadata
+                   in self.spreadsheet.make_all_dictionaries()[0]
+                   if "Source" in handbrake_metadata}
+        sources -= self._validated_sources
+        if not sources:
+            return
+        sources = sorted(sources)
+        with ThreadPoolExecutor(max_workers=min(32, len(sources))) as executor:
+            exists = list(executor.map(os.path.exists, sources))
+        missing = [source for source, found in zip(sources, exists)
+                   if not found]
+        if missing:
+            message = 'These source files do not exist:\n' + '\n'.join(missing)
+            raise ValueError(message)
+        self._validated_sources.update(sources)
+
+    def _scan_chapters(self, item: int) -> str:
+        handbrake_metadata = self.spreadsheet.make_handbrake_dictionary(item)
+        video = self._get_video(handbrake_metadata["Source"])
+        video.converter_options.source.title = handbrake_metadata["Title"]
+        return video.get_number_of_chapters()
+
+    def _prescan_chapters(self, n_cores: int = None):
+        """
+        Count the chapters of every item without a "Chapters" entry before
+        any conversion starts. The HandBrakeCLI scans run concurrently, so
+        the total scan time is roughly that of the slowest scan rather than
+        the sum of all of them.
+        """
+        unscanned = [item for item, handbrake_metadata
+                     in enumerate(self.spreadsheet.make_all_dictionaries()[0])
+                     if "Chapters" not in handbrake_metadata
+                     and item not in self._chapter_cache]
+        if not unscanned:
+            return
+        with get_thread_pool_executor(n_cores) as executor:
+            self._chapter_cache.update(
+                zip(unscanned, executor.map(self._scan_chapters, unscanned)))
+
+    def _run_in_parallel(self, method, n_cores: int = None,
+                         then=None, **kwargs):
+        """
+        Run `method` on every item, `n_cores` items at a time. Each job spends
+        its time waiting on an external encoder, so the jobs run on threads of
+        this process rather than in worker processes. If `then` is given, it's
+        called on each item in a background thread as soon as that item's work
+        finishes, so the second stage of early items overlaps the first stage
+        of later ones.
+        """
+        self._prevalidate_sources()
+        self._prescan_chapters(n_cores)
+        n_items = self.spreadsheet.n_items
+        # Share the cores between the simultaneous encodes instead of letting
+        # each one start a thread per core.
+        n_workers = min(n_cores or get_appropriate_number_of_cores(), n_items)
+        if n_workers > 1:
+            kwargs['encoder_threads'] = max(1, os.cpu_count() // n_workers)
+        start = time.perf_counter()
+        stop = threading.Event()
+        with get_thread_pool_executor(n_cores) as executor, \
+                get_thread_pool_executor(n_cores) as follow_up:
+            futures = {executor.submit(self._timed, method, item, stop,
+                                       **kwargs): item
+                       for item in range(n_items)}
+            follow_ups = []
+            failure = None
+            finished = 0
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = futures[future]
+                        try:
+                            duration = future.result()
+                        except Exception as exception:
+                            if failure is None:
+                                failure = exception
+                                self._cancel_queued_items(executor)
+                            continue
+                        if duration is None:
+                            continue
+                        finished += 1
+                        elapsed = time.perf_counter() - start
+                        print(f'Item {item + 1} finished in '
+                              f'{duration:.1f} s ({finished}/{n_items} done, '
+                              f'{elapsed:.1f} s elapsed).')
+                        if then is not None:
+                            follow_ups.append(follow_up.submit(then, item))
+                    if failure is not None:
+                        # Cancelled futures never complete, so only the items
+                        # that were already running are left to wait for.
+                        pending = {future for future in pending
+                                   if not future.cancelled()}
+            except BaseException:
+                stop.set()
+                self._cancel_queued_items(executor)
+                raise
+            for future in follow_ups:
+                future.result()
+            if failure is not None:
+                raise failure
 
-    def _parallel_tag(self, item):
-        handbrake_dictionary = self.spreadsheet.make_handbrake_dictionary(item)
-        metadata_dictionary = self.spreadsheet.make_subler_dictionary(item)
-        MP4(handbrake_dictionary["Destination"]).tag(metadata_dictionary)
+    @staticmethod
+    def _cancel_queued_items(executor):
+        # Drop the queued items, which could take hours, before a failure is
+        # reported. A worker can take the next item before this runs, which
+        # the stop flag in _timed turns away. Items already running still
+        # finish, and still get their follow-up.
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    def _parallel_convert_and_tag(self, item):
+    @staticmethod
+    def _timed(method, item: int, stop, **kwargs) -> float:
+        """The time `method` took on the item, or None if it was skipped
+        because another item had already failed."""
+        if stop.is_set():
+            return None
+        start = time.perf_counter()
+        try:
+            method(item, **kwargs)
+        except BaseException:
+            # Set in the worker itself, so it can't pick up another item
+            # before the main thread has seen the failure.
+            stop.set()
+            raise
+        return time.perf_counter() - start
+
+    def _parallel_convert(self, item, nice=None, encoder_threads=None):
         video = self._set_source_parameters(item)
-        video.convert()
-        handbrake_dictionary = self.spreadsheet.make_handbrake_dictionary(item)
-        metadata_dictionary = self.spreadsheet.make_subler_dictionary(item)
-        MP4(handbrake_dictionary["Destination"]).tag(metadata_dictionary)
+        video.converter_options.video.threads = encoder_threads
+        video.convert(nice)
 
-    def _test_parallel_convert_and_tag(self, item):
+    def _test_parallel_convert(self, item, nice=None, encoder_threads=None):
         video = self._set_source_parameters(item)
-        video.test_convert()
-        handbrake_dictionary = self.spreadsheet.make_handbrake_dictionary(item)
-        metadata_dictionary = self.spreadsheet.make_subler_dictionary(item)
-        MP4(handbrake_dictionary["Destination"]).tag(metadata_dictionary)
+        video.converter_options.video.threads = encoder_threads
+        video.test_convert(nice)
+
+    def _parallel_tag(self, item, in_place=False):
+        MP4(self.spreadsheet.destinations[item]).tag(
+            self.spreadsheet.make_subler_dictionary(item), in_place)
+
+    def _tag_converted(self, item):
+        # Only called once the item has converted successfully, so its
+        # destination is known to exist.
+        MP4(self.spreadsheet.destinations[item], check_exists=False).tag(
+            self.spreadsheet.make_subler_dictionary(item))
 
     def serial_convert(self):
         """
@@ -478,11 +551,13 @@ class Spreadsheet:
         for a set of high-definition videos, while parallel conversion is
         better for a set of standard-definition videos.
         """
+        self._prevalidate_sources()
+        self._prescan_chapters()
         for item in range(self.spreadsheet.n_items):
             video = self._set_source_parameters(item)
             video.convert()
 
-    def parallel_convert(self, n_cores: int = None):
+    def parallel_convert(self, n_cores: int = None, nice: int = None):
         """
         Convert the source to destination using the Handbrake parameters for
         each item. This converts multiple items at once using as many cores as
@@ -494,32 +569,47 @@ class Spreadsheet:
         ----------
         n_cores
             If desired, the user-specified number of cores to use.
+        nice
+            If desired, the niceness to run each encode at.
         """
-        pool = get_multiprocessing_pool(n_cores)
-        for item in range(self.spreadsheet.n_items):
-            pool.apply_async(self._parallel_convert, args=(item,))
-        cleanup_parallel_processing(pool)
+        self._run_in_parallel(self._parallel_convert, n_cores, nice=nice)
 
-    def test_convert(self):
+    def test_convert(self, n_cores: int = None, nice: int = None):
         """
         Test conversion of a spreadsheet. This is done using parallel
         processing.
+
+        Parameters
+        ----------
+        n_cores
+            If desired, the user-specified number of cores to use.
+        nice
+            If desired, the niceness to run each encode at.
         """
-        pool = get_multiprocessing_pool()
-        for item in range(self.spreadsheet.n_items):
-            pool.apply_async(self._test_parallel_convert, args=(item,))
-        cleanup_parallel_processing(pool)
+        self._run_in_parallel(self._test_parallel_convert, n_cores, nice=nice)
 
-    def tag(self):
+    def tag(self, n_cores: int = None, in_place: bool = False):
         """
         Assuming all source items are MP4 files which only need tagging, tag
         them in parallel using the Subler parameters for each item. This uses
         the "Destination" parameter as the source and destination file.
-        """
-        pool = get_multiprocessing_pool()
-        for item in range(self.spreadsheet.n_items):
-            pool.apply_async(self._parallel_tag, args=(item,))
-        cleanup_parallel_processing(pool)
+        Tagging is all SublerCLI and disk time, so the items are spread over
+        threads rather than processes.
+
+        Parameters
+        ----------
+        n_cores
+            If desired, the user-specified number of simultaneous tagging
+            jobs.
+        in_place
+            If True, have SublerCLI update each file's metadata in place
+            instead of writing each tagged video from a temporary copy.
+        """
+        with get_thread_pool_executor(n_cores) as executor:
+            futures = [executor.submit(self._parallel_tag, item, in_place)
+                       for item in range(self.spreadsheet.n_items)]
+            for future in as_completed(futures):
+                future.result()
 
     def serial_convert_and_tag(self):
         """
@@ -528,16 +618,28 @@ class Spreadsheet:
         at a time using as many cores as your computer decides to allocate. I
         find serial conversion is better for a set of high-definition videos,
         while parallel conversion is better for a set of standard-definition
-        videos.
-        """
-        for item in range(self.spreadsheet.n_items):
-            handbrake_dictionary = self.spreadsheet.make_handbrake_dictionary(item)
-            subler_dictionary = self.spreadsheet.make_subler_dictionary(item)
-            video = self._set_source_parameters(item)
-            video.convert()
-            MP4(handbrake_dictionary["Destination"]).tag(subler_dictionary)
-
-    def parallel_convert_and_tag(self, n_cores=None):
+        videos. Each item is tagged in a background thread while the next one
+        converts.
+        """
+        destinations = self.spreadsheet.destinations
+        handbrake_dictionaries, subler_dictionaries = \
+            self.spreadsheet.make_all_dictionaries()
+        self._prevalidate_sources()
+        self._prescan_chapters()
+        with ThreadPoolExecutor(max_workers=1) as tagger:
+            tagging = []
+            for item in range(self.spreadsheet.n_items):
+                video = self._set_source_parameters(
+                    item, handbrake_dictionaries[item])
+                video.convert()
+                converted = MP4(destinations[item], check_exists=False)
+                tagging.append(tagger.submit(converted.tag,
+                                             subler_dictionaries[item]))
+            for future in tagging:
+                future.result()
+
+    def parallel_convert_and_tag(self, n_cores: int = None,
+                                 nice: int = None):
         """
         Convert the source to destination using the Handbrake parameters then
         tag with Subler parameters for each item. This converts multiple items
@@ -550,21 +652,26 @@ class Spreadsheet:
         ----------
         n_cores
             If desired, the user-specified number of cores to use.
+        nice
+            If desired, the niceness to run each encode at.
         """
-        pool = get_multiprocessing_pool(n_cores)
-        for item in range(self.spreadsheet.n_items):
-            pool.apply_async(self._parallel_convert_and_tag, args=(item,))
-        cleanup_parallel_processing(pool)
+        self._run_in_parallel(self._parallel_convert, n_cores,
+                              then=self._tag_converted, nice=nice)
 
-    def test_convert_and_tag(self):
+    def test_convert_and_tag(self, n_cores: int = None, nice: int = None):
         """
         Test conversion and tagging of a spreadsheet. This is done using
         parallel processing.
+
+        Parameters
+        ----------
+        n_cores
+            If desired, the user-specified number of cores to use.
+        nice
+            If desired, the niceness to run each encode at.
         """
-        pool = get_multiprocessing_pool()
-        for item in range(self.spreadsheet.n_items):
-            pool.apply_async(self._test_parallel_convert_and_tag, args=(item,))
-        cleanup_parallel_processing(pool)
+        self._run_in_parallel(self._test_parallel_convert, n_cores,
+                              then=self._tag_converted, nice=nice)
 
 
 def make_empty_metadata_spreadsheet(save_directory: str, kind: str):
@@ -661,6 +768,12 @@ def make_empty_metadata_spreadsheet(save_directory: str, kind: str):
        - 22±2 for 1080p Full High Definition
        - 25±2 for 2160p 4K Ultra High Definition
 
+     - **Video Encoder:** Optional. The HandBrake video encoder, "x265" if left empty. Hardware encoders like "vt_h265"
+       (Apple VideoToolbox), "nvenc_h265" (NVIDIA) or "qsv_h265" (Intel Quick Sync) are many times faster and leave the
+       CPU free for other conversions, at some cost in quality for the same file size. Consumer NVIDIA cards only run a
+       few encoding sessions at once, so don't convert more items in parallel than your card allows.
+     - **Encoder Preset:** Optional. The encoder speed preset, "fast" if left empty. Hardware encoders have their own
+       presets, e.g., "speed", "balanced" or "quality" for VideoToolbox and Quick Sync.
      - **Subtitle:** If you want to hard-burn a subtitle track, put its number here.
      - **Chapters:** If you want to name the chapters, you need to provide the absolute path to a CSV file containing
        those names. You will want these in escaped format, so for instance:
@@ -728,6 +841,12 @@ def make_empty_metadata_spreadsheet(save_directory: str, kind: str):
        - 22±2 for 1080p Full High Definition
        - 25±2 for 2160p 4K Ultra High Definition
 
+     - **Video Encoder:** Optional. The HandBrake video encoder, "x265" if left empty. Hardware encoders like "vt_h265"
+       (Apple VideoToolbox), "nvenc_h265" (NVIDIA) or "qsv_h265" (Intel Quick Sync) are many times faster and leave the
+       CPU free for other conversions, at some cost in quality for the same file size. Consumer NVIDIA cards only run a
+       few encoding sessions at once, so don't convert more items in parallel than your card allows.
+     - **Encoder Preset:** Optional. The encoder speed preset, "fast" if left empty. Hardware encoders have their own
+       presets, e.g., "speed", "balanced" or "quality" for VideoToolbox and Quick Sync.
      - **Subtitle:** If you want to hard-burn a subtitle track, put its number here.
      - **Chapters:** If you want to name the chapters, you need to provide the absolute path to a CSV file containing
        those names. You will want these in escaped format, so for instance: